@@ -4,39 +4,106 @@ PostgreSQL Docker 컨테이너 전용 동적 스키마 검색 SQL Agent
 """
 
 import os
-from dotenv import load_dotenv
+from types import MappingProxyType
+from typing import Mapping, Optional
+from urllib.parse import quote
 
-# Load environment variables from .env file
-load_dotenv()
+# Load environment variables
+# 1) scripts/compile_env.py로 생성한 env_config.py가 있으면 .env 파싱 없이 사용
+# 2) 없으면 .env 파일 로드 - Docker 등에서 환경변수가 이미 주입된 경우 파싱(및 dotenv import)을 건너뜀
+try:
+    from env_config import ENV as _COMPILED_ENV
+    # load_dotenv(override=False)와 같이 환경변수로도 내보냄 (OPENAI_*, 프록시 등 라이브러리가 직접 읽는 값)
+    for _key, _value in _COMPILED_ENV.items():
+        os.environ.setdefault(_key, _value)
+except ImportError:
+    _COMPILED_ENV = {}
+    _DOTENV_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".env")
+    if not os.environ.get("POSTGRES_HOST") and (os.path.isfile(".env") or os.path.isfile(_DOTENV_PATH)):
+        from dotenv import load_dotenv
+        load_dotenv()
+
+# 환경변수 스냅샷 (import 시 한 번만 복사, 실제 환경변수가 우선)
+_ENV = {**_COMPILED_ENV, **os.environ}
+_get = _ENV.get
+_port = _get("POSTGRES_PORT")
+
+
+def _flag(name: str) -> bool:
+    """'1'/'true'/'yes' 형태의 불리언 환경변수 해석"""
+    return _get(name, "").lower() in ("1", "true", "yes")
 
 
 class Config:
     """PostgreSQL Docker 컨테이너 전용 설정 관리 클래스"""
     
     # AI 모델 설정 - Ollama
-    OLLAMA_BASE_URL = os.getenv("OLLAMA_BASE_URL", "http://localhost:11434/v1")
-    OLLAMA_MODEL = os.getenv("OLLAMA_MODEL", "qwen3:4b")
-    OLLAMA_API_KEY = os.getenv("OLLAMA_API_KEY", "ollama")  # 로컬에서는 임의값
+    OLLAMA_BASE_URL = _get("OLLAMA_BASE_URL", "http://localhost:11434/v1")
+    OLLAMA_MODEL = _get("OLLAMA_MODEL", "qwen3:4b")
+    OLLAMA_API_KEY = _get("OLLAMA_API_KEY", "ollama")  # 로컬에서는 임의값
     TEMPERATURE = 0
+    LLM_MAX_CONCURRENCY = 4  # ask_many에서 동시에 보낼 LLM 요청 수
     
     # 쿼리 제한
-    MAX_RESULTS = 10
+    MAX_RESULTS = int(_get("MAX_RESULTS", "10"))
+    # MAX_RESULTS가 이 값을 넘으면 서버 사이드 커서로 STREAM_CHUNK_SIZE씩 스트리밍
+    # (작은 LIMIT 조회는 서버 커서 생성 비용이 더 크므로 클라이언트 커서 사용)
+    STREAM_THRESHOLD = int(_get("STREAM_THRESHOLD", "1000"))
+    STREAM_CHUNK_SIZE = int(_get("STREAM_CHUNK_SIZE", "1000"))
     MAX_TOKENS = 4000
     REQUEST_TIMEOUT = 30
     
+    # 커넥션 풀 설정 (PgBouncer transaction 모드에서는 USE_NULLPOOL=true 권장)
+    DB_POOL_SIZE = int(_get("DB_POOL_SIZE", "25"))
+    DB_MAX_OVERFLOW = int(_get("DB_MAX_OVERFLOW", "0"))
+    DB_POOL_RECYCLE = int(_get("DB_POOL_RECYCLE", "60"))
+    DB_POOL_TIMEOUT = int(_get("DB_POOL_TIMEOUT", "30"))
+    USE_NULLPOOL = _flag("USE_NULLPOOL")
+    APPLICATION_NAME = "sql_agent"  # pg_stat_activity에 표시될 이름
+    
+    # 컬럼 메타데이터 캐시 유효 시간 (초)
+    SCHEMA_CACHE_TTL = 300
+    
+    # 질문별 WHERE 조건 캐시 최대 개수
+    WHERE_CACHE_SIZE = 256
+    
+    # 쿼리 결과 캐시 (TTL 초, 0이면 사용 안 함)
+    QUERY_CACHE_TTL = int(_get("QUERY_CACHE_TTL", "60"))
+    QUERY_CACHE_SIZE = 256
+    
+    # 프롬프트에 넣을 컨텍스트 컬럼별 고유값 최대 개수 (나머지는 개수만 표시)
+    PROMPT_MAX_DISTINCT_VALUES = 20
+    
+    # 프롬프트에 넣는 값 하나의 최대 글자 수 (긴 텍스트 값은 잘라서 "…" 표시)
+    PROMPT_MAX_VALUE_CHARS = 80
+    
+    # 샘플 값을 테이블 스캔 대신 pg_stats.most_common_vals에서 가져올지 여부 (ANALYZE 필요)
+    USE_PG_STATS = _flag("USE_PG_STATS")
+    
+    # 컬럼 고유값 디스크 캐시 경로 (빈 문자열이면 사용 안 함)
+    DISTINCT_CACHE_PATH = os.path.expanduser(_get("DISTINCT_CACHE_PATH", "~/.cache/hi/distinct_values.sqlite"))
+    
+    # LLM 응답 디스크 캐시 경로 (LangChain SQLiteCache, 프로세스 재시작 후에도 유지 / 빈 문자열이면 사용 안 함)
+    LLM_CACHE_PATH = os.path.expanduser(_get("LLM_CACHE_PATH", ""))
+    
     # Domain specific prompt context (optional)
-    DOMAIN_CONTEXT = os.getenv("DOMAIN_CONTEXT", "")
+    DOMAIN_CONTEXT = _get("DOMAIN_CONTEXT", "")
     
     # PostgreSQL Docker 설정 (환경변수 필수)
-    POSTGRES_HOST = os.getenv("POSTGRES_HOST")
-    POSTGRES_PORT = int(os.getenv("POSTGRES_PORT", "5432")) if os.getenv("POSTGRES_PORT") else None
-    POSTGRES_USER = os.getenv("POSTGRES_USER")
-    POSTGRES_PASSWORD = os.getenv("POSTGRES_PASSWORD") 
-    POSTGRES_DB = os.getenv("POSTGRES_DB")
+    POSTGRES_HOST = _get("POSTGRES_HOST")
+    POSTGRES_PORT = int(_port) if _port else None
+    POSTGRES_USER = _get("POSTGRES_USER")
+    POSTGRES_PASSWORD = _get("POSTGRES_PASSWORD") 
+    POSTGRES_DB = _get("POSTGRES_DB")
     
     # 고정 테이블 및 컬럼 설정
-    TARGET_TABLE = os.getenv("TARGET_TABLE", "gangs")  # 기본값: gangs
-    TARGET_COLUMN = os.getenv("TARGET_COLUMN", "id")    # 기본값: id
+    TARGET_TABLE = _get("TARGET_TABLE", "gangs")  # 기본값: gangs
+    TARGET_COLUMN = _get("TARGET_COLUMN", "id")    # 기본값: id
+    
+    # 최초 조립 후 재사용하는 캐시
+    _postgres_uri: Optional[str] = None
+    _connection_info: Optional[Mapping[str, object]] = None
+    _engine = None
     
     @classmethod
     def validate_environment(cls) -> None:
@@ -63,16 +130,52 @@ class Config:
     
     @classmethod
     def get_postgres_uri(cls) -> str:
-        """PostgreSQL URI 생성"""
-        return f"postgresql://{cls.POSTGRES_USER}:{cls.POSTGRES_PASSWORD}@{cls.POSTGRES_HOST}:{cls.POSTGRES_PORT}/{cls.POSTGRES_DB}"
+        """PostgreSQL URI 생성 (최초 호출 시 한 번만 조립)
+
+        사용자/비밀번호에 '@', ':', '/' 등이 있어도 깨지지 않도록 인코딩합니다.
+        """
+        if cls._postgres_uri is None:
+            # quote_plus의 '+'(공백)는 SQLAlchemy make_url이 디코딩하지 않으므로 %20으로 인코딩
+            user = quote(cls.POSTGRES_USER or "", safe="")
+            password = quote(cls.POSTGRES_PASSWORD or "", safe="")
+            cls._postgres_uri = (
+                f"postgresql://{user}:{password}@{cls.POSTGRES_HOST}:{cls.POSTGRES_PORT}/{cls.POSTGRES_DB}"
+                f"?application_name={cls.APPLICATION_NAME}"
+            )
+        return cls._postgres_uri
+    
+    @classmethod
+    def get_connection_info(cls) -> Mapping[str, object]:
+        """연결 정보 반환 (공유 객체이므로 읽기 전용 뷰)"""
+        if cls._connection_info is None:
+            cls._connection_info = MappingProxyType({
+                "host": cls.POSTGRES_HOST,
+                "port": cls.POSTGRES_PORT,
+                "database": cls.POSTGRES_DB,
+                "user": cls.POSTGRES_USER,
+                "type": "PostgreSQL Docker Container"
+            })
+        return cls._connection_info
     
     @classmethod
-    def get_connection_info(cls) -> dict:
-        """연결 정보 반환"""
-        return {
-            "host": cls.POSTGRES_HOST,
-            "port": cls.POSTGRES_PORT,
-            "database": cls.POSTGRES_DB,
-            "user": cls.POSTGRES_USER,
-            "type": "PostgreSQL Docker Container"
-        } 
\ No newline at end of file
+    def get_pooled_engine(cls):
+        """프로세스 전역에서 공유하는 SQLAlchemy 엔진(커넥션 풀) 반환"""
+        if cls._engine is None:
+            from sqlalchemy import create_engine
+            from sqlalchemy.pool import NullPool, QueuePool
+            
+            if cls.USE_NULLPOOL:
+                # 풀링은 PgBouncer에 맡기고 요청마다 연결/해제
+                pool_kwargs = {"poolclass": NullPool}
+            else:
+                # PgBouncer 환경에서 체크아웃마다 SELECT 1을 보내지 않도록 pre-ping 대신 주기적 재생성
+                pool_kwargs = {
+                    "poolclass": QueuePool,
+                    "pool_size": cls.DB_POOL_SIZE,
+                    "max_overflow": cls.DB_MAX_OVERFLOW,
+                    "pool_recycle": cls.DB_POOL_RECYCLE,
+                    "pool_timeout": cls.DB_POOL_TIMEOUT,
+                    "pool_pre_ping": False,
+                }
+            cls._engine = create_engine(cls.get_postgres_uri(), **pool_kwargs)
+        return cls._engine
@@ -7,11 +7,17 @@ Simple PostgreSQL SQL Agent
 import logging
 import sys
 
-from simple_agent import create_simple_agent
+try:
+    import readline  # noqa: F401 - input()에 줄 편집/히스토리 제공
+except ImportError:
+    pass
 
 # 모듈 로거
 logger = logging.getLogger(__name__)
 
+# 대화형 모드 종료 명령어
+_EXIT = frozenset(('quit', 'exit', 'q'))
+
 def setup_logging(verbose: bool = False):
     """로깅 설정"""
     level = logging.DEBUG if verbose else logging.INFO
@@ -28,6 +34,8 @@ def run_interactive():
     logger.info("-" * 60)
     
     try:
+        # langchain/sqlalchemy 로딩 비용은 실제 에이전트가 필요할 때만 지불
+        from simple_agent import create_simple_agent
         agent = create_simple_agent()
         logger.info(f"✅ 연결 성공! 테이블: {agent.target_table}")
         logger.info(f"사용 가능한 컬럼: {', '.join(agent.list_columns())}")
@@ -42,20 +50,23 @@ def run_interactive():
             if not user_input:
                 continue
                 
-            if user_input.lower() in ['quit', 'exit', 'q']:
+            cmd = user_input.lower()
+            if cmd in _EXIT:
                 logger.info("👋 종료합니다.")
                 break
             
             # 자연어 쿼리 처리
-            logger.info(f"🔍 질문 분석 중...")
+            logger.info("🔍 질문 분석 중...")
             result = agent.ask(user_input)
             
             if result['success']:
-                logger.info(f"📝 생성된 SQL: {result['sql']}")
+                if result.get('sql'):
+                    logger.info("📝 생성된 SQL: %s", result['sql'])
                 vals = result.get('result', [])
                 col = result.get('target_column', 'value')
                 if vals:
-                    logger.info(f"✅ 발견된 {col.upper()} 값: {', '.join(map(str, vals))}")
+                    if logger.isEnabledFor(logging.INFO):
+                        logger.info("✅ 발견된 %s 값: %s", col.upper(), ', '.join([str(v) for v in vals]))
                 else:
                     logger.info("✅ 조건에 맞는 데이터를 찾지 못했습니다.")
             else:
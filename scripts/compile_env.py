@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+.env → env_config.py 변환 스크립트
+매 실행마다 .env를 파싱하지 않도록 값을 파이썬 모듈로 고정합니다.
+(.pyc 바이트코드 캐시 덕분에 두 번째 실행부터는 파싱 비용이 없습니다)
+"""
+
+import argparse
+import os
+import py_compile
+import sys
+
+from dotenv import dotenv_values
+
+# 프로젝트 루트 (config.py가 있는 위치)
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def compile_env(env_path: str, output_path: str) -> int:
+    """.env 파일을 ENV 딕셔너리를 담은 파이썬 모듈로 변환하고 항목 수를 반환"""
+    values = {k: v for k, v in dotenv_values(env_path).items() if v is not None}
+    
+    lines = [
+        '"""',
+        '.env에서 자동 생성된 파일 - 직접 수정하지 마세요 (scripts/compile_env.py)',
+        '"""',
+        '',
+        'ENV = {',
+    ]
+    lines.extend(f"    {key!r}: {value!r}," for key, value in sorted(values.items()))
+    lines.append('}')
+    
+    with open(output_path, "w", encoding="utf-8") as f:
+        f.write("\n".join(lines) + "\n")
+    py_compile.compile(output_path, doraise=True)
+    return len(values)
+
+
+def main():
+    """메인 함수"""
+    parser = argparse.ArgumentParser(description=".env를 env_config.py로 컴파일")
+    parser.add_argument("--env", default=os.path.join(ROOT_DIR, ".env"), help=".env 파일 경로")
+    parser.add_argument("--output", default=os.path.join(ROOT_DIR, "env_config.py"), help="생성할 모듈 경로")
+    args = parser.parse_args()
+    
+    if not os.path.isfile(args.env):
+        print(f"❌ .env 파일을 찾을 수 없습니다: {args.env}")
+        sys.exit(1)
+    
+    count = compile_env(args.env, args.output)
+    print(f"✅ {count}개 항목을 {args.output}에 저장했습니다.")
+
+
+if __name__ == "__main__":
+    main()
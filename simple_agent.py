@@ -4,17 +4,232 @@ Simple PostgreSQL Agent
 고정 테이블에서 'id' 컬럼만 조회하고, WHERE절을 자연어로 생성하는 간소화된 에이전트
 """
 
+import asyncio
 import logging
-from typing import List, Dict, Any, Optional
-from langchain_openai import ChatOpenAI
-from langchain_community.utilities import SQLDatabase
-from langchain.schema import HumanMessage, SystemMessage
-from sqlalchemy import create_engine, text, inspect
+import os
+import threading
+import time
+from collections import OrderedDict
+from contextlib import nullcontext
+from functools import lru_cache
+from typing import TYPE_CHECKING, List, Dict, Any, Optional, Tuple
+from sqlalchemy import text
+from sqlalchemy.exc import NoSuchTableError
 from config import Config
+from value_cache import DistinctValueCache
 import re
 
+# langchain 모듈은 import 비용이 커서 실제로 사용하는 시점에 불러옴 (타입 힌트용으로만 import)
+if TYPE_CHECKING:
+    from langchain.schema import SystemMessage
+
 logger = logging.getLogger(__name__)
 
+# 컬럼 메타데이터 캐시: (엔진 URL, 스키마, 테이블) -> (저장 시각, 컬럼 정보)
+_COLUMN_CACHE: Dict[Tuple[str, Optional[str], str], Tuple[float, List[Dict[str, Any]]]] = {}
+
+
+# 여러 테이블의 컬럼 정보를 한 번에 조회 (inspector.get_columns는 테이블마다 여러 번 카탈로그 조회)
+_COLUMNS_BULK_SQL = text("""
+    SELECT table_name, column_name, data_type, is_nullable, column_default
+    FROM information_schema.columns
+    WHERE table_schema = COALESCE(:schema, current_schema()) AND table_name = ANY(:tables)
+    ORDER BY table_name, ordinal_position
+""")
+
+
+def get_columns_bulk(engine, tables: List[str], schema: Optional[str] = None) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    information_schema.columns 한 번의 조회로 여러 테이블의 컬럼 정보 반환
+    
+    Returns:
+        {테이블명: [{"name", "type", "nullable", "default"}, ...]} (존재하지 않는 테이블은 제외)
+    """
+    columns_by_table: Dict[str, List[Dict[str, Any]]] = {}
+    with engine.connect() as conn:
+        result = conn.execute(_COLUMNS_BULK_SQL, {"schema": schema, "tables": list(tables)})
+        for table_name, column_name, data_type, is_nullable, column_default in result:
+            columns_by_table.setdefault(table_name, []).append({
+                "name": column_name,
+                "type": data_type,
+                "nullable": is_nullable == "YES",
+                "default": column_default,
+            })
+    return columns_by_table
+
+
+def _cached_get_columns(engine, table: str, schema: Optional[str] = None,
+                        ttl: float = Config.SCHEMA_CACHE_TTL) -> List[Dict[str, Any]]:
+    """테이블 컬럼 정보를 TTL 동안 캐시 (information_schema 왕복 생략)"""
+    key = (str(engine.url), schema, table)
+    now = time.monotonic()
+    cached = _COLUMN_CACHE.get(key)
+    if cached is not None and now - cached[0] < ttl:
+        return cached[1]
+    
+    columns_info = get_columns_bulk(engine, [table], schema).get(table)
+    if not columns_info:
+        raise NoSuchTableError(table)
+    _COLUMN_CACHE[key] = (now, columns_info)
+    return columns_info
+
+
+# 컬럼별 최빈값 통계 (anyarray는 text[]로 변환해 드라이버가 리스트로 받도록 함)
+_PG_STATS_SAMPLES_SQL = text("""
+    SELECT attname, most_common_vals::text::text[]
+    FROM pg_stats
+    WHERE schemaname = current_schema() AND tablename = :table
+      AND attname = ANY(:columns) AND most_common_vals IS NOT NULL
+""")
+
+
+# 고유값 디스크 캐시 무효화 토큰: 테이블 파일 번호 + 누적 변경 행 수
+# (TRUNCATE/VACUUM FULL은 변경 행 수를 늘리지 않지만 파일 번호를 바꿈)
+_TABLE_CHANGE_TOKEN_SQL = text("""
+    SELECT pg_relation_filenode(relid)::text || ':' || (n_tup_ins + n_tup_upd + n_tup_del)::text
+    FROM pg_stat_user_tables
+    WHERE relid = to_regclass(:table)
+""")
+
+
+def _schema_fingerprint(columns_info: List[Dict[str, Any]]) -> Tuple[Tuple[Any, ...], ...]:
+    """컬럼 구성(이름/타입/NULL 허용) 요약 - refresh_schema에서 변경이 없으면 재구성 생략"""
+    return tuple((col["name"], col["type"], col["nullable"]) for col in columns_info)
+
+
+# 질문 정규화용 (공백 연속 → 한 칸)
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def _normalize_query(natural_query: str) -> str:
+    """WHERE절 캐시 키로 쓰기 위해 질문을 정규화"""
+    return _WHITESPACE_RE.sub(" ", natural_query.strip().lower())
+
+
+# LLM 응답 후처리용 정규식
+_THINK_RE = re.compile(r"<think>[\s\S]*?</think>", re.IGNORECASE)
+_FENCE_RE = re.compile(r"^\s*```(?:[a-zA-Z]+\s*$)?|```\s*$", re.MULTILINE)
+_WHERE_PREFIX_RE = re.compile(r"^where\s+", re.IGNORECASE)
+
+
+def _extract_where(response_text: str) -> str:
+    """LLM 응답에서 <think> 블록/코드 블록을 걷어내고 마지막 줄의 WHERE 조건만 추출"""
+    text = _FENCE_RE.sub("", _THINK_RE.sub("", response_text))
+    lines = [ln.strip() for ln in text.splitlines() if ln.strip()]
+    condition = lines[-1].rstrip(";").strip() if lines else ""
+    return _WHERE_PREFIX_RE.sub("", condition)
+
+
+# LLM이 만든 WHERE 조건에서 거부할 패턴 (다중 구문, 뒤따르는 LIMIT을 무력화하는 주석)
+_UNSAFE_WHERE_RE = re.compile(r";|--|/\*")
+
+# 프롬프트 TSV 셀에 들어가면 안 되는 문자 (탭/줄바꿈/구분자)
+_TSV_UNSAFE_RE = re.compile(r"[\t\r\n|]")
+
+
+def _truncate_value(value: Any, limit: int) -> str:
+    """프롬프트용 값 문자열화 (limit 글자를 넘으면 잘라서 "…" 표시)"""
+    value_str = str(value)
+    if len(value_str) > limit:
+        return value_str[:limit - 1] + "…"
+    return value_str
+
+
+# LLM 없이 에이전트가 이미 가진 정보로 답할 수 있는 질문 (패턴, 의도)
+# 데이터 질문("Which columns have Watson ...", "status 컬럼 종류별 ...")을 가로채지 않도록 질문 전체 형태만 매칭
+_INTENT_ROUTES = [
+    (re.compile(r"^\s*(?:(?:(?:list|show)\s+(?:me\s+)?(?:all\s+)?(?:the\s+)?|all\s+)?columns?"
+                r"|(?:what|which)\s+columns\s+(?:are\s+there|exist|are\s+available|do\s+you\s+have)"
+                r"|what\s+are\s+the\s+(?:available\s+)?columns"
+                r"|(?:전체\s*)?컬럼\s*(?:목록|리스트)(?:\s*(?:좀\s*)?(?:보여\s*줘|알려\s*줘))?"
+                r"|(?:어떤|무슨)\s*컬럼들?이\s*(?:있어|있나요|있니|있습니까)"
+                r"|컬럼들?\s*(?:이|은)?\s*뭐(?:가\s*있어|야|예요|에요)?"
+                r")\s*[?.]?\s*$", re.IGNORECASE), "list_columns"),
+]
+
+# 모델이 다음 예시 질문을 이어서 생성하지 않도록 하는 stop 시퀀스
+_LLM_STOP = ["\nQuestion:"]
+
+
+def _looks_complete(buffer: str) -> bool:
+    """스트리밍 중인 응답에 완성된 WHERE 조건이 들어있는지 판단"""
+    # 아직 <think> 블록 안이면 계속 수신
+    if buffer.rfind("<think>") > buffer.rfind("</think>"):
+        return False
+    answer = buffer.rpartition("</think>")[2].strip()
+    if not answer:
+        return False
+    # 세미콜론으로 끝났거나 코드 블록이 닫혔으면 완료
+    return answer.endswith(";") or answer.count("```") >= 2
+
+
+@lru_cache(maxsize=4)
+def _get_llm(model: str, api_key: str, base_url: str, temperature: float,
+             max_tokens: int, request_timeout: int):
+    """
+    설정별 ChatOpenAI 클라이언트 (에이전트 간 공유)
+    
+    HTTP 클라이언트/커넥션 풀 구성 비용을 에이전트마다 다시 치르지 않도록,
+    같은 설정이면 같은 인스턴스를 반환합니다.
+    """
+    from langchain_openai import ChatOpenAI
+    
+    return ChatOpenAI(
+        model=model,
+        api_key=api_key,
+        base_url=base_url,
+        temperature=temperature,
+        max_tokens=max_tokens,
+        request_timeout=request_timeout
+    )
+
+
+@lru_cache(maxsize=None)
+def _enable_llm_cache(path: str) -> bool:
+    """
+    LangChain 전역 LLM 캐시를 SQLite 파일로 설정 (경로별 최초 1회)
+    
+    설정 후에는 같은 프롬프트/모델 설정의 invoke/batch 호출이 파일에서 응답을 가져옵니다.
+    
+    Returns:
+        설정 성공 여부
+    """
+    try:
+        from langchain.globals import set_llm_cache
+        from langchain_community.cache import SQLiteCache
+        
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        set_llm_cache(SQLiteCache(database_path=path))
+        logger.debug(f"LLM 응답 캐시 사용: {path}")
+        return True
+    except Exception as e:
+        logger.warning(f"LLM 응답 캐시를 설정할 수 없습니다: {e}")
+        return False
+
+
+def _stream_finished(piece: str, buffer: str) -> bool:
+    """스트리밍 중 방금 받은 조각으로 WHERE 조건이 완성됐는지 확인 (완성 시 스트림 조기 종료)"""
+    if (";" in piece or "`" in piece) and _looks_complete(buffer):
+        logger.debug("WHERE 조건 완성 - 응답 스트림 조기 종료")
+        return True
+    return False
+
+
+def _error_result(natural_query: str, error: Exception) -> Dict[str, Any]:
+    """질문 처리 중 예외가 났을 때의 응답"""
+    return {
+        "success": False,
+        "natural_query": natural_query,
+        "error": str(error)
+    }
+
+
+def invalidate_schema_cache():
+    """컬럼 메타데이터 캐시 비우기 (DDL 변경 후 호출)"""
+    _COLUMN_CACHE.clear()
+
 
 class SimplePostgreSQLAgent:
     """간소화된 PostgreSQL Agent - 고정 테이블, 'id' SELECT, WHERE절만 처리"""
@@ -23,8 +238,7 @@ class SimplePostgreSQLAgent:
         """Agent 초기화"""
         Config.validate_environment()
         
-        self.engine = create_engine(Config.get_postgres_uri())
-        self.db = SQLDatabase.from_uri(Config.get_postgres_uri())
+        self.engine = Config.get_pooled_engine()
         self.target_table = Config.TARGET_TABLE
         self.target_column = Config.TARGET_COLUMN
         
@@ -32,84 +246,306 @@ class SimplePostgreSQLAgent:
         self.domain_context = Config.DOMAIN_CONTEXT
         
         self.llm = None
+        self._llm_cache_enabled = False
         try:
-            self.llm = ChatOpenAI(
-                model=Config.OLLAMA_MODEL,
-                api_key=Config.OLLAMA_API_KEY,
-                base_url=Config.OLLAMA_BASE_URL,
-                temperature=Config.TEMPERATURE,
-                max_tokens=Config.MAX_TOKENS,
-                request_timeout=Config.REQUEST_TIMEOUT
+            self.llm = _get_llm(
+                Config.OLLAMA_MODEL,
+                Config.OLLAMA_API_KEY,
+                Config.OLLAMA_BASE_URL,
+                Config.TEMPERATURE,
+                Config.MAX_TOKENS,
+                Config.REQUEST_TIMEOUT
             )
             logger.debug(f"Ollama 모델 초기화 완료: {Config.OLLAMA_MODEL} @ {Config.OLLAMA_BASE_URL}")
+            
+            # LLM 응답 디스크 캐시 (스트리밍 호출은 캐시를 거치지 않으므로 캐시 사용 시 invoke로 호출)
+            self._llm_cache_enabled = bool(Config.LLM_CACHE_PATH) and _enable_llm_cache(Config.LLM_CACHE_PATH)
         except Exception as e:
             logger.warning(f"Ollama 초기화 실패: {e}. 자연어 쿼리 기능을 사용할 수 없습니다.")
         
+        # refresh_schema에서 변경 여부 비교용 (_get_table_columns가 조회한 컬럼 정보로 기록, 추가 DB 조회 없음)
+        self._last_fingerprint: Optional[Tuple[Tuple[Any, ...], ...]] = None
         self.columns = self._get_table_columns()
+        self._column_set = frozenset(self.columns)  # O(1) 존재 여부 확인용
+        
+        # 별도 엔진/풀을 만들지 않도록 기존 엔진을 공유하고, 대상 테이블만 필요할 때 반영(샘플 행 조회 생략)
+        # 테이블이 없으면 include_tables 검증에서 실패하므로 컬럼 조회에 성공한 경우에만 지정
+        from langchain_community.utilities import SQLDatabase
+        
+        self.db = SQLDatabase(
+            engine=self.engine,
+            include_tables=[self.target_table] if self.columns else None,
+            sample_rows_in_table_info=0,
+            lazy_table_reflection=True
+        )
+        
+        # 프롬프트용 컬럼 값과 완성된 시스템 프롬프트 (세션 동안 거의 변하지 않으므로 최초 1회만 구성)
+        self._prompt_values: Optional[List[List[Any]]] = None
+        self._system_prompt: Optional[str] = None
+        self._system_message: "Optional[SystemMessage]" = None
+        
+        # 컬럼 고유값 디스크 캐시 (프로세스 재시작 후에도 재사용, 경로가 비어 있으면 사용 안 함)
+        self._value_cache: Optional[DistinctValueCache] = None
+        if Config.DISTINCT_CACHE_PATH:
+            try:
+                self._value_cache = DistinctValueCache(Config.DISTINCT_CACHE_PATH)
+            except Exception as e:
+                logger.warning(f"고유값 캐시를 열 수 없습니다: {e}")
+        
+        # SQL → (저장 시각, 결과) 캐시 (Config.QUERY_CACHE_TTL 동안 같은 쿼리 재실행 생략)
+        self._query_cache: "OrderedDict[str, Tuple[float, Tuple[Any, ...]]]" = OrderedDict()
+        self._query_cache_lock = threading.Lock()  # aexecute_fixed_query는 워커 스레드에서 실행됨
+        
+        # 정규화된 질문 → WHERE 조건 LRU 캐시 (프롬프트가 바뀌면 비움)
+        self._where_cache: "OrderedDict[str, str]" = OrderedDict()
         
         logger.debug(f"Simple Agent 초기화 완료 - 테이블: {self.target_table}, 컬럼: {len(self.columns)}개")
 
     def _get_table_columns(self) -> List[str]:
-        """대상 테이블의 컬럼 목록 조회"""
+        """대상 테이블의 컬럼 목록 조회 (조회한 컬럼 구성의 fingerprint도 함께 기록)"""
         try:
-            inspector = inspect(self.engine)
-            columns_info = inspector.get_columns(self.target_table)
-            return [col['name'] for col in columns_info]
+            columns_info = _cached_get_columns(self.engine, self.target_table)
         except Exception as e:
             logger.error(f"테이블 {self.target_table} 컬럼 조회 실패: {e}")
+            self._last_fingerprint = None
             return []
+        self._last_fingerprint = _schema_fingerprint(columns_info)
+        return [col['name'] for col in columns_info]
+
+    def refresh_schema(self, force: bool = False):
+        """
+        대상 테이블의 컬럼 목록을 다시 조회
+        
+        컬럼 구성(fingerprint)이 마지막 조회 때와 같으면 아무것도 다시 만들지 않습니다.
+        force=True이거나 이전 조회에서 컬럼을 얻지 못했다면 비교 없이 캐시를 모두 비우고 다시 조회합니다.
+        """
+        if not force and self.columns:
+            try:
+                columns_info = get_columns_bulk(self.engine, [self.target_table]).get(self.target_table)
+            except Exception as e:
+                logger.warning(f"스키마 변경 확인 실패: {e}")
+                columns_info = None
+            if columns_info and _schema_fingerprint(columns_info) == self._last_fingerprint:
+                logger.debug("스키마 변경 없음 - 컬럼/프롬프트 캐시 유지")
+                return
+        
+        invalidate_schema_cache()
+        self.columns = self._get_table_columns()
+        self._column_set = frozenset(self.columns)
+        self.refresh_prompt()
+        self.clear_query_cache()
 
     def list_columns(self) -> List[str]:
         """사용 가능한 컬럼 목록 반환"""
         return self.columns.copy()
 
-    def get_sample_data(self, column: str, limit: int = 5) -> List[Any]:
-        """특정 컬럼의 샘플 데이터 조회"""
-        if column not in self.columns:
+    def _connect(self, conn=None):
+        """conn이 주어지면 그대로 재사용하고, 없으면 풀에서 새 커넥션을 체크아웃"""
+        return nullcontext(conn) if conn is not None else self.engine.connect()
+
+    def _pg_stats_samples(self, columns: List[str], limit: int, conn=None) -> Dict[str, List[str]]:
+        """
+        pg_stats.most_common_vals에서 컬럼별 샘플 값 조회 (테이블을 스캔하지 않음)
+        
+        통계가 없는 컬럼(ANALYZE 전, 고유값만 있는 컬럼 등)은 결과에서 빠집니다.
+        값은 텍스트로 반환됩니다.
+        """
+        if not columns:
+            return {}
+        try:
+            with self._connect(conn) as active:
+                result = active.execute(_PG_STATS_SAMPLES_SQL, {"table": self.target_table, "columns": list(columns)})
+                return {name: list(values[:limit]) for name, values in result if values}
+        except Exception as e:
+            logger.warning(f"pg_stats 샘플 조회 실패, 테이블 조회로 대체합니다: {e}")
+            if conn is not None:
+                conn.rollback()  # 공유 커넥션을 이후 조회에 쓸 수 있도록 실패한 트랜잭션 정리
+            return {}
+
+    def _table_change_token(self, conn=None) -> Optional[str]:
+        """대상 테이블의 변경 토큰 (고유값 디스크 캐시 무효화용, 통계가 없으면 None)"""
+        try:
+            with self._connect(conn) as active:
+                return active.execute(_TABLE_CHANGE_TOKEN_SQL, {"table": self.target_table}).scalar()
+        except Exception as e:
+            logger.warning(f"테이블 변경 통계 조회 실패: {e}")
+            if conn is not None:
+                conn.rollback()
+            return None
+
+    def _value_cache_key(self, column: str, kind: str) -> str:
+        """
+        고유값 디스크 캐시 키
+        
+        kind: "all" - get_all_distinct_values (NULL 포함, 원래 타입 그대로)
+              "ctx" - 프롬프트 컨텍스트 값 (NULL 제외, jsonb 정렬)
+        """
+        return DistinctValueCache.make_key(str(self.engine.url), self.target_table, column, kind)
+
+    def get_sample_data(self, column: str, limit: int = 5, conn=None) -> List[Any]:
+        """특정 컬럼의 샘플 데이터 조회 (conn을 넘기면 해당 커넥션 재사용)"""
+        if column not in self._column_set:
             return []
         
+        if Config.USE_PG_STATS:
+            samples = self._pg_stats_samples([column], limit, conn).get(column)
+            if samples:
+                return samples
+        
         try:
-            with self.engine.connect() as conn:
-                result = conn.execute(text(f"SELECT DISTINCT \"{column}\" FROM {self.target_table} LIMIT {limit}"))
-                return [row[0] for row in result.fetchall()]
+            with self._connect(conn) as active:
+                stmt = text(f'SELECT DISTINCT "{column}" FROM {self.target_table} LIMIT :lim')
+                return list(active.execute(stmt, {"lim": limit}).scalars())
         except Exception as e:
             logger.error(f"샘플 데이터 조회 실패: {e}")
+            if conn is not None:
+                conn.rollback()
             return []
 
-    def get_all_distinct_values(self, column: str) -> List[Any]:
-        """지정된 컬럼의 모든 고유값을 가져오기"""
-        if column not in self.columns:
+    def get_all_distinct_values(self, column: str, conn=None) -> List[Any]:
+        """지정된 컬럼의 모든 고유값을 가져오기 (conn을 넘기면 해당 커넥션 재사용)"""
+        if column not in self._column_set:
             logger.warning(f"컬럼 '{column}'은 테이블에 존재하지 않습니다.")
             return []
         try:
-            with self.engine.connect() as conn:
-                result = conn.execute(text(f'SELECT DISTINCT "{column}" FROM {self.target_table} ORDER BY 1'))
-                values = [row[0] for row in result.fetchall()]
+            with self._connect(conn) as active:
+                # 테이블이 바뀌지 않았으면 디스크 캐시 사용
+                token = self._table_change_token(active) if self._value_cache else None
+                if token is not None:
+                    cached = self._value_cache.get(self._value_cache_key(column, "all"), token)
+                    if cached is not None:
+                        return cached
+                
+                result = active.execute(text(f'SELECT DISTINCT "{column}" FROM {self.target_table} ORDER BY 1'))
+                values = list(result.scalars())
                 logger.debug(f"컬럼 '{column}'에서 {len(values)}개의 고유값을 가져왔습니다.")
+                
+                if token is not None:
+                    self._value_cache.put(self._value_cache_key(column, "all"), token, values)
                 return values
         except Exception as e:
             logger.error(f"컬럼 '{column}'의 고유값 조회 실패: {e}")
+            if conn is not None:
+                conn.rollback()
             return []
 
-    def execute_fixed_query(self, where_condition: str = "") -> Dict[str, Any]:
-        """고정 컬럼에 대한 쿼리를 실행하고 값 목록을 반환"""
-        if self.target_column not in self.columns:
+    def get_distinct_values_bulk(self, specs: List[Tuple[str, Optional[int]]], conn=None) -> List[List[Any]]:
+        """
+        여러 컬럼의 고유값을 UNION ALL 한 번의 왕복으로 조회
+        
+        Args:
+            specs: (컬럼명, limit) 목록. limit이 None이면 NULL을 제외한 전체 고유값(정렬), 아니면 샘플 limit개
+            conn: 재사용할 커넥션 (없으면 풀에서 체크아웃)
+        
+        Returns:
+            specs 순서와 같은 값 목록의 목록 (존재하지 않는 컬럼은 빈 목록)
+        """
+        values: List[List[Any]] = [[] for _ in specs]
+        subqueries: List[Tuple[str, Dict[str, int]]] = []
+        for i, (column, limit) in enumerate(specs):
+            if column not in self._column_set:
+                continue
+            # jsonb로 컬럼 타입을 통일하면서 숫자/문자열 구분은 유지
+            if limit is None:
+                # 전체 고유값은 서버에서 배열 하나로 집계해 한 행으로 받음 (DISTINCT/정렬도 jsonb 값 기준)
+                subqueries.append((
+                    f'SELECT {i} AS col_idx, jsonb_agg(DISTINCT to_jsonb("{column}") ORDER BY to_jsonb("{column}")) '
+                    f'FILTER (WHERE "{column}" IS NOT NULL) AS v FROM {self.target_table}',
+                    {}
+                ))
+            else:
+                # DISTINCT는 jsonb로 변환한 값에 적용 (json/point 등 등호 연산자가 없는 타입도 조회 가능)
+                inner = f'SELECT DISTINCT to_jsonb("{column}") AS v FROM {self.target_table} LIMIT :lim{i}'
+                subqueries.append((f"SELECT {i} AS col_idx, s{i}.v FROM ({inner}) s{i}", {f"lim{i}": limit}))
+        
+        if not subqueries:
+            return values
+        
+        try:
+            with self._connect(conn) as active:
+                try:
+                    params = {k: v for _, sub_params in subqueries for k, v in sub_params.items()}
+                    rows = list(active.execute(text(" UNION ALL ".join([sql for sql, _ in subqueries])), params))
+                except Exception as e:
+                    # 한 컬럼 때문에 전체가 비지 않도록 컬럼별로 다시 조회 (실패한 컬럼만 빈 목록)
+                    logger.warning(f"컬럼 값 일괄 조회 실패, 컬럼별 조회로 대체합니다: {e}")
+                    active.rollback()
+                    rows = []
+                    for sql, sub_params in subqueries:
+                        try:
+                            rows.extend(active.execute(text(sql), sub_params))
+                        except Exception as e:
+                            logger.error(f"컬럼 값 조회 실패: {e}")
+                            active.rollback()
+            
+            for col_idx, value in rows:
+                if specs[col_idx][1] is None:
+                    values[col_idx] = value or []
+                else:
+                    values[col_idx].append(value)
+        except Exception as e:
+            logger.error(f"컬럼 값 일괄 조회 실패: {e}")
+            if conn is not None:
+                conn.rollback()
+        return values
+
+    def execute_fixed_query(self, where_condition: str = "", conn=None) -> Dict[str, Any]:
+        """고정 컬럼에 대한 쿼리를 실행하고 값 목록을 반환 (conn을 넘기면 해당 커넥션 재사용)"""
+        if self.target_column not in self._column_set:
             return {
                 "success": False,
                 "error": f"테이블에 '{self.target_column}' 컬럼이 존재하지 않습니다.",
             }
         
+        if _UNSAFE_WHERE_RE.search(where_condition):
+            return {
+                "success": False,
+                "where_condition": where_condition,
+                "error": "WHERE 조건에 세미콜론이나 주석은 사용할 수 없습니다.",
+            }
+        
         sql = f'SELECT {self.target_column} FROM {self.target_table}'
         if where_condition.strip():
             sql += f' WHERE {where_condition}'
         sql += f' LIMIT {Config.MAX_RESULTS}'
         
+        # SQL은 항상 같은 방식으로 조립되므로 그대로 키로 사용 (공백 정규화는 문자열 리터럴까지 바꿈)
+        cache_key = sql
+        with self._query_cache_lock:
+            cached = self._query_cache.get(cache_key)
+            if cached is not None:
+                if time.monotonic() - cached[0] < Config.QUERY_CACHE_TTL:
+                    self._query_cache.move_to_end(cache_key)  # LRU 순서 갱신
+                else:
+                    del self._query_cache[cache_key]  # 만료된 항목 제거
+                    cached = None
+        if cached is not None:
+            logger.debug(f"쿼리 결과 캐시 적중: {sql}")
+            return {
+                "success": True,
+                "sql": sql,
+                "result": list(cached[1]),
+                "where_condition": where_condition
+            }
+        
         try:
-            with self.engine.connect() as conn:
-                result = conn.execute(text(sql))
-                vals = [row[0] for row in result.fetchall()]
+            stmt = text(sql)
+            if Config.MAX_RESULTS > Config.STREAM_THRESHOLD:
+                # 결과가 클 때만 서버 사이드 커서로 나눠 받아 메모리 사용량을 청크 크기로 제한
+                # (커넥션이 아닌 구문에 지정해야 공유 커넥션의 다음 쿼리에 옵션이 남지 않음)
+                stmt = stmt.execution_options(stream_results=True, yield_per=Config.STREAM_CHUNK_SIZE)
+            with self._connect(conn) as active:
+                vals = list(active.execute(stmt).scalars())
             
-            logger.debug(f"SQL 실행 성공: {sql} -> {vals}")
+            # % 포맷은 DEBUG 로그가 실제로 출력될 때만 결과 목록을 문자열로 만듦
+            logger.debug("SQL 실행 성공: %s -> %s", sql, vals)
+            
+            if Config.QUERY_CACHE_TTL > 0:
+                with self._query_cache_lock:
+                    self._query_cache[cache_key] = (time.monotonic(), tuple(vals))
+                    self._query_cache.move_to_end(cache_key)
+                    if len(self._query_cache) > Config.QUERY_CACHE_SIZE:
+                        self._query_cache.popitem(last=False)
             
             return {
                 "success": True,
@@ -118,44 +554,111 @@ class SimplePostgreSQLAgent:
                 "where_condition": where_condition
             }
         except Exception as e:
+            if conn is not None:
+                conn.rollback()  # 공유 커넥션의 다음 쿼리가 실패한 트랜잭션에 막히지 않도록 정리
             return {
                 "success": False,
                 "sql": sql,
                 "error": str(e)
             }
 
+    async def aexecute_fixed_query(self, where_condition: str = "") -> Dict[str, Any]:
+        """execute_fixed_query의 비동기 버전 (블로킹 DB 호출을 스레드에서 실행)"""
+        return await asyncio.to_thread(self.execute_fixed_query, where_condition)
+
+    def clear_query_cache(self):
+        """쿼리 결과 캐시 비우기 (데이터 변경 직후 최신 결과가 필요할 때)"""
+        with self._query_cache_lock:
+            self._query_cache.clear()
+
     def set_domain_context(self, context: str):
         """도메인 특화 프롬프트 컨텍스트를 런타임에 설정"""
         self.domain_context = context.strip()
+        self._system_prompt = None  # 컬럼 값 캐시는 유지하고 프롬프트만 다시 조립
+        self._system_message = None
+        self._where_cache.clear()
 
-    def analyze_query(self, natural_query: str) -> str:
-        """자연어 질문을 분석해서 WHERE 조건을 추출"""
-        if not self.llm:
-            raise RuntimeError("Ollama AI 모델이 초기화되지 않았습니다. Ollama 서버가 실행 중인지 확인하세요.")
+    def _fetch_prompt_values(self, context_columns: List[str]) -> List[List[Any]]:
+        """
+        프롬프트용 값 조회: 컨텍스트 컬럼의 전체 고유값 + 모든 컬럼의 샘플 3개
+        
+        디스크 캐시(컨텍스트 값)와 pg_stats(샘플)로 채울 수 있는 값은 건너뛰고,
+        나머지만 한 커넥션에서 한 번의 왕복으로 조회합니다.
+        
+        Returns:
+            context_columns 순서의 고유값 목록 + self.columns 순서의 샘플 목록
+        """
+        with self._connect() as conn:
+            token = self._table_change_token(conn) if self._value_cache else None
+            cached_context: Dict[str, List[Any]] = {}
+            if token is not None:
+                for col in context_columns:
+                    cached = self._value_cache.get(self._value_cache_key(col, "ctx"), token)
+                    if cached is not None:
+                        cached_context[col] = cached
+            
+            # pg_stats에 통계가 있는 컬럼은 테이블 스캔 없이 샘플 사용
+            stats_samples = self._pg_stats_samples(self.columns, 3, conn) if Config.USE_PG_STATS else {}
+            
+            context_to_fetch = [c for c in context_columns if c not in cached_context]
+            sample_columns = [c for c in self.columns if c not in stats_samples]
+            specs = [(c, None) for c in context_to_fetch] + [(c, 3) for c in sample_columns]
+            fetched = self.get_distinct_values_bulk(specs, conn)
+        
+        fetched_context = dict(zip(context_to_fetch, fetched[:len(context_to_fetch)]))
+        fetched_samples = dict(zip(sample_columns, fetched[len(context_to_fetch):]))
+        if token is not None:
+            for col, values in fetched_context.items():
+                if values:  # 조회 실패(빈 결과)는 저장하지 않음
+                    self._value_cache.put(self._value_cache_key(col, "ctx"), token, values)
+        
+        context_values = [cached_context[c] if c in cached_context else fetched_context[c] for c in context_columns]
+        sample_values = [stats_samples[c] if c in stats_samples else fetched_samples[c] for c in self.columns]
+        return context_values + sample_values
 
+    def _build_system_prompt(self) -> str:
+        """DB 컬럼 값/샘플을 바탕으로 시스템 프롬프트 구성"""
         # --- ▼▼▼ 수정된 섹션 시작 ▼▼▼ ---
 
         # 1. 전체 값 컨텍스트를 제공할 컬럼 정의
         # (config.py에서 관리하는 것이 좋습니다)
         context_columns_to_show = ["region", "gang_name", "status"]
         
-        # 2. 지정된 컨텍스트 컬럼들에 대해 모든 고유값 가져오기
+        context_columns = [c for c in context_columns_to_show if c in self._column_set]
+        
+        # 2. 컨텍스트 컬럼의 전체 고유값 + 모든 컬럼의 샘플 데이터를 한 번에 가져오기
+        prompt_values = self._prompt_values
+        if prompt_values is None:
+            prompt_values = self._fetch_prompt_values(context_columns)
+            if any(prompt_values):  # 조회 실패(빈 결과)는 캐시하지 않음
+                self._prompt_values = prompt_values
+        context_values = prompt_values[:len(context_columns)]
+        sample_values = prompt_values[len(context_columns):]
+        
+        max_values = Config.PROMPT_MAX_DISTINCT_VALUES
+        max_chars = Config.PROMPT_MAX_VALUE_CHARS
         context_values_info = []
-        for col_name in context_columns_to_show:
-            if col_name in self.columns:
-                distinct_values = self.get_all_distinct_values(col_name)
-                if distinct_values:
-                    # 값들을 쉼표로 구분된 문자열로 포맷팅
-                    values_str = ", ".join([f"'{v}'" if isinstance(v, str) else str(v) for v in distinct_values])
-                    # 어떤 컬럼의 값인지 명확히 보여주는 라벨 생성
-                    context_values_info.append(f"- **'{col_name}'** 컬럼의 사용 가능한 값들: [{values_str}]")
-
-        # 3. 모든 사용 가능한 컬럼에 대한 샘플 데이터 가져오기
-        column_sample_info = []
-        for col in self.columns:
-            samples = self.get_sample_data(col, 3)
-            sample_str = ", ".join([f"'{s}'" if isinstance(s, str) else str(s) for s in samples])
-            column_sample_info.append(f"- {col} (예시: {sample_str})")
+        for col_name, distinct_values in zip(context_columns, context_values):
+            if distinct_values:
+                # 값들을 쉼표로 구분된 문자열로 포맷팅 (토큰 절약을 위해 최대 max_values개)
+                values_str = ", ".join([
+                    f"'{_truncate_value(v, max_chars)}'" if isinstance(v, str) else str(v)
+                    for v in distinct_values[:max_values]
+                ])
+                if len(distinct_values) > max_values:
+                    values_str += f", …(+{len(distinct_values) - max_values} more)"
+                # 어떤 컬럼의 값인지 명확히 보여주는 라벨 생성
+                context_values_info.append(f"- **'{col_name}'** 컬럼의 사용 가능한 값들: [{values_str}]")
+
+        # 3. 모든 사용 가능한 컬럼을 컬럼/타입/샘플 TSV 한 줄씩으로 압축
+        try:
+            column_types = {c["name"]: c["type"] for c in _cached_get_columns(self.engine, self.target_table)}
+        except Exception:
+            column_types = {}
+        column_sample_info = ["column\ttype\tsamples"]
+        for col, samples in zip(self.columns, sample_values):
+            sample_str = "|".join([_TSV_UNSAFE_RE.sub(" ", _truncate_value(v, max_chars)) for v in samples])
+            column_sample_info.append(f"{col}\t{column_types.get(col, '')}\t{sample_str}")
 
         # 4. 최종 base_prompt를 영어로 구성
         base_prompt = f"""You are an expert at converting natural language questions into PostgreSQL WHERE clauses.
@@ -167,7 +670,9 @@ Table: {self.target_table}
 {chr(10).join(context_values_info)}
 ---
 ### All Available Columns
+```tsv
 {chr(10).join(column_sample_info)}
+```
 ---
 
 ### Instructions
@@ -192,37 +697,173 @@ Table: {self.target_table}
         else:
             system_prompt = base_prompt
         
-        messages = [
-            SystemMessage(content=system_prompt),
+        # 컬럼 값 조회에 성공한 경우에만 캐시 (실패 시 다음 호출에서 재시도)
+        if self._prompt_values is not None:
+            self._system_prompt = system_prompt
+        return system_prompt
+
+    def _get_system_message(self) -> "SystemMessage":
+        """캐시된 SystemMessage 반환 (프롬프트가 캐시된 경우 같은 객체를 재사용)"""
+        from langchain.schema import SystemMessage
+        
+        if self._system_message is not None:
+            return self._system_message
+        
+        message = SystemMessage(content=self._system_prompt or self._build_system_prompt())
+        if self._system_prompt is not None:
+            self._system_message = message
+        return message
+
+    def refresh_prompt(self):
+        """캐시된 시스템 프롬프트와 컬럼 값(디스크 캐시 포함)을 버리고 다음 질문에서 다시 구성"""
+        self._prompt_values = None
+        self._system_prompt = None
+        self._system_message = None
+        self._where_cache.clear()
+        # 디스크에 남은 고유값도 버려야 다음 구성에서 DB를 다시 조회함
+        if self._value_cache is not None:
+            self._value_cache.delete([
+                self._value_cache_key(col, kind) for col in self.columns for kind in ("all", "ctx")
+            ])
+
+    def _build_messages(self, natural_query: str) -> list:
+        """WHERE 조건 생성용 메시지 구성 (시스템 메시지는 캐시된 객체 재사용)"""
+        from langchain.schema import HumanMessage
+        
+        return [
+            self._get_system_message(),
             HumanMessage(content=f"Question: {natural_query}")
         ]
+
+    def _cached_where(self, cache_key: str) -> Optional[str]:
+        """WHERE 조건 캐시 조회 (적중 시 LRU 순서 갱신)"""
+        cached = self._where_cache.get(cache_key)
+        if cached is not None:
+            self._where_cache.move_to_end(cache_key)
+            logger.debug(f"WHERE 조건 캐시 적중: {cached}")
+        return cached
+
+    def _remember_where(self, cache_key: str, condition: str):
+        """WHERE 조건 캐시에 저장 (최대 크기를 넘으면 가장 오래된 항목 제거)"""
+        self._where_cache[cache_key] = condition
+        if len(self._where_cache) > Config.WHERE_CACHE_SIZE:
+            self._where_cache.popitem(last=False)
+
+    def _start_where(self, natural_query: str) -> Tuple[str, Optional[str]]:
+        """WHERE 조건 추출 준비: (캐시 키, 캐시된 조건 또는 None) 반환"""
+        if not self.llm:
+            raise RuntimeError("Ollama AI 모델이 초기화되지 않았습니다. Ollama 서버가 실행 중인지 확인하세요.")
+        
+        cache_key = _normalize_query(natural_query)
+        return cache_key, self._cached_where(cache_key)
+
+    def _finish_where(self, cache_key: str, response_text: str) -> str:
+        """LLM 응답에서 WHERE 조건을 추출하고 캐시에 저장"""
+        condition = _extract_where(response_text)
+        logger.debug(f"분석된 WHERE 조건: {condition}")
+        self._remember_where(cache_key, condition)
+        return condition
+
+    def analyze_query(self, natural_query: str) -> str:
+        """자연어 질문을 분석해서 WHERE 조건을 추출"""
+        cache_key, cached = self._start_where(natural_query)
+        if cached is not None:
+            return cached
+
+        messages = self._build_messages(natural_query)
         
         try:
-            response = self.llm.invoke(messages)
-            condition = response.content.strip()
-            
-            # 후처리 로직 (기존과 동일)
-            condition = re.sub(r"<think>[\s\S]*?</think>", "", condition, flags=re.IGNORECASE)
-            
-            if condition.lower().startswith("where "):
-                condition = condition[6:]
-            if condition.startswith("```"):
-                condition = "\n".join(condition.strip("`").split("\n")[1:])
-            if condition.endswith("```"):
-                condition = condition.split("\n")[0]
-            
-            lines = [ln.strip() for ln in condition.splitlines() if ln.strip()]
-            condition = lines[-1] if lines else ""
-            
-            if condition.endswith(";"):
-                condition = condition[:-1].strip()
-            
-            logger.debug(f"분석된 WHERE 조건: {condition}")
-            return condition
-            
+            if self._llm_cache_enabled:
+                # 디스크 캐시를 거치도록 일반 호출 (캐시 적중 시 LLM 호출 없음)
+                buffer = self.llm.invoke(messages, stop=_LLM_STOP).content
+            else:
+                # 전체 생성을 기다리지 않고, 완성된 조건이 보이면 스트림을 끊음
+                buffer = ""
+                for chunk in self.llm.stream(messages, stop=_LLM_STOP):
+                    buffer += chunk.content
+                    if _stream_finished(chunk.content, buffer):
+                        break
+        except Exception as e:
+            logger.error(f"쿼리 분석 실패: {e}")
+            return ""
+        return self._finish_where(cache_key, buffer)
+
+    async def aanalyze_query(self, natural_query: str) -> str:
+        """analyze_query의 비동기 버전 (LLM 응답을 기다리는 동안 이벤트 루프를 막지 않음)"""
+        cache_key, cached = self._start_where(natural_query)
+        if cached is not None:
+            return cached
+
+        # 시스템 프롬프트가 아직 없으면 구성에 DB 조회가 필요하므로 스레드에서 실행
+        if self._system_message is None:
+            messages = await asyncio.to_thread(self._build_messages, natural_query)
+        else:
+            messages = self._build_messages(natural_query)
+        
+        try:
+            if self._llm_cache_enabled:
+                buffer = (await self.llm.ainvoke(messages, stop=_LLM_STOP)).content
+            else:
+                buffer = ""
+                async for chunk in self.llm.astream(messages, stop=_LLM_STOP):
+                    buffer += chunk.content
+                    if _stream_finished(chunk.content, buffer):
+                        break
         except Exception as e:
             logger.error(f"쿼리 분석 실패: {e}")
             return ""
+        return self._finish_where(cache_key, buffer)
+
+    def analyze_queries(self, natural_queries: List[str]) -> List[str]:
+        """
+        여러 질문의 WHERE 조건을 한 번에 추출
+        
+        같은(정규화 기준) 질문은 한 번만 묻고, 캐시에 없는 질문들은 LLM에 동시에 요청합니다.
+        실패한 질문은 빈 조건("")으로 반환됩니다.
+        """
+        keys: List[str] = []
+        conditions: Dict[str, str] = {}
+        pending: Dict[str, str] = {}  # 캐시 키 → 대표 질문
+        for natural_query in natural_queries:
+            key, cached = self._start_where(natural_query)
+            keys.append(key)
+            if key in conditions or key in pending:
+                continue
+            if cached is not None:
+                conditions[key] = cached
+            else:
+                pending[key] = natural_query
+        
+        if pending:
+            responses = self.llm.batch(
+                [self._build_messages(q) for q in pending.values()],
+                config={"max_concurrency": Config.LLM_MAX_CONCURRENCY},
+                return_exceptions=True,
+                stop=_LLM_STOP
+            )
+            for key, response in zip(pending, responses):
+                if isinstance(response, Exception):
+                    logger.error(f"쿼리 분석 실패: {response}")
+                    conditions[key] = ""
+                    continue
+                conditions[key] = self._finish_where(key, response.content)
+        
+        return [conditions[key] for key in keys]
+
+    def _answer_without_llm(self, natural_query: str) -> Optional[Dict[str, Any]]:
+        """LLM 호출 전에 응답이 정해지는 경우(의도 라우팅, 대상 컬럼 없음)의 결과 (아니면 None)"""
+        routed = self._route_intent(natural_query)
+        if routed is not None:
+            return routed
+        if self.target_column not in self._column_set:
+            return self._missing_target_column_result(natural_query)
+        return None
+
+    def _query_result(self, result: Dict[str, Any], natural_query: str) -> Dict[str, Any]:
+        """쿼리 실행 결과에 질문/대상 컬럼 정보 추가"""
+        result["natural_query"] = natural_query
+        result["target_column"] = self.target_column
+        return result
 
     def ask(self, natural_query: str) -> Dict[str, Any]:
         """
@@ -232,29 +873,84 @@ Table: {self.target_table}
             natural_query: 자연어 질문 (예: "가장 외곽에 있는 조직이 어디야?")
         """
         try:
-            if self.target_column not in self.columns:
-                return {
-                    "success": False,
-                    "natural_query": natural_query,
-                    "error": f"'{self.target_column}' 컬럼이 테이블 '{self.target_table}'에 존재하지 않습니다.",
-                    "available_columns": self.columns
-                }
+            answered = self._answer_without_llm(natural_query)
+            if answered is not None:
+                return answered
 
             where_condition = self.analyze_query(natural_query)
+            return self._query_result(self.execute_fixed_query(where_condition), natural_query)
             
-            # 쿼리 실행
-            result = self.execute_fixed_query(where_condition)
-            result["natural_query"] = natural_query
-            result["target_column"] = self.target_column
+        except Exception as e:
+            return _error_result(natural_query, e)
+
+    async def aask(self, natural_query: str) -> Dict[str, Any]:
+        """
+        ask의 비동기 버전
+        
+        LLM 호출과 DB 조회가 이벤트 루프를 막지 않으므로, 비동기 웹 서버 등에서
+        한 프로세스로 여러 질문을 동시에 처리할 수 있습니다.
+        """
+        try:
+            answered = self._answer_without_llm(natural_query)
+            if answered is not None:
+                return answered
+
+            where_condition = await self.aanalyze_query(natural_query)
+            return self._query_result(await self.aexecute_fixed_query(where_condition), natural_query)
             
-            return result
+        except Exception as e:
+            return _error_result(natural_query, e)
+
+    def ask_many(self, natural_queries: List[str]) -> List[Dict[str, Any]]:
+        """
+        여러 자연어 질문을 한 번에 처리
+        
+        WHERE 조건 생성은 LLM에 동시에 요청하고, 생성된 쿼리는 커넥션 하나에서
+        한 트랜잭션으로 순서대로 실행합니다. 결과는 입력 순서와 같습니다.
+        """
+        results: List[Optional[Dict[str, Any]]] = [self._answer_without_llm(q) for q in natural_queries]
+        pending = [i for i, answered in enumerate(results) if answered is None]
+        if not pending:
+            return results
+        
+        try:
+            where_conditions = self.analyze_queries([natural_queries[i] for i in pending])
+            
+            with self._connect() as conn:
+                for i, where_condition in zip(pending, where_conditions):
+                    result = self.execute_fixed_query(where_condition, conn=conn)
+                    results[i] = self._query_result(result, natural_queries[i])
+            return results
             
         except Exception as e:
-            return {
-                "success": False,
-                "natural_query": natural_query,
-                "error": str(e)
-            }
+            for i in pending:
+                results[i] = _error_result(natural_queries[i], e)
+            return results
+
+    def _route_intent(self, natural_query: str) -> Optional[Dict[str, Any]]:
+        """컬럼 목록처럼 LLM 없이 답할 수 있는 질문이면 바로 응답 (아니면 None)"""
+        for pattern, intent in _INTENT_ROUTES:
+            if pattern.search(natural_query):
+                logger.debug(f"의도 라우팅: {intent}")
+                if intent == "list_columns":
+                    return {
+                        "success": True,
+                        "natural_query": natural_query,
+                        "sql": None,
+                        "result": self.list_columns(),
+                        "target_column": "column",
+                        "intent": intent
+                    }
+        return None
+
+    def _missing_target_column_result(self, natural_query: str) -> Dict[str, Any]:
+        """대상 컬럼이 테이블에 없을 때의 응답"""
+        return {
+            "success": False,
+            "natural_query": natural_query,
+            "error": f"'{self.target_column}' 컬럼이 테이블 '{self.target_table}'에 존재하지 않습니다.",
+            "available_columns": self.columns
+        }
 
 
 def create_simple_agent() -> SimplePostgreSQLAgent:
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Distinct Value Cache
+컬럼 고유값을 로컬 SQLite 파일에 저장해 프로세스가 다시 시작돼도 재사용하는 캐시
+"""
+
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+from typing import Any, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class DistinctValueCache:
+    """(DB, 테이블, 컬럼) 별 고유값 캐시 - 테이블 변경 토큰이 같을 때만 적중"""
+
+    def __init__(self, path: str):
+        """캐시 파일을 열고 테이블이 없으면 생성"""
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS distinct_values ("
+                "key TEXT PRIMARY KEY, token TEXT NOT NULL, payload TEXT NOT NULL)"
+            )
+
+    @staticmethod
+    def make_key(db_url: str, table: str, column: str, kind: str) -> str:
+        """
+        캐시 키 생성 (DB URL은 해시로만 저장)
+        
+        kind는 값을 만든 쪽을 구분합니다. 같은 컬럼이라도 조회 방식(NULL 포함 여부, 정렬)이
+        다르면 서로의 값을 돌려주지 않도록 키를 분리합니다.
+        """
+        db_hash = hashlib.sha1(db_url.encode("utf-8")).hexdigest()[:16]
+        return f"{db_hash}:{table}:{column}:{kind}"
+
+    def get(self, key: str, token: str) -> Optional[List[Any]]:
+        """토큰이 일치하는 캐시 값 반환 (없거나 변경됐거나 캐시를 읽을 수 없으면 None)"""
+        try:
+            with self._lock:
+                row = self._conn.execute(
+                    "SELECT token, payload FROM distinct_values WHERE key = ?", (key,)
+                ).fetchone()
+            if row is None or row[0] != token:
+                return None
+            return json.loads(row[1])
+        except (sqlite3.Error, ValueError) as e:
+            # 잠긴/손상된 캐시 파일은 캐시 미스로 처리해 DB에서 다시 조회
+            logger.warning(f"고유값 캐시 조회 실패: {e}")
+            return None
+
+    def put(self, key: str, token: str, values: List[Any]):
+        """고유값 저장 (JSON으로 표현할 수 없는 값은 문자열로 저장)"""
+        payload = json.dumps(values, ensure_ascii=False, default=str)
+        try:
+            with self._lock, self._conn:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO distinct_values (key, token, payload) VALUES (?, ?, ?)",
+                    (key, token, payload)
+                )
+        except sqlite3.Error as e:
+            logger.warning(f"고유값 캐시 저장 실패: {e}")
+
+    def delete(self, keys: List[str]):
+        """지정한 키의 캐시 삭제"""
+        if not keys:
+            return
+        try:
+            with self._lock, self._conn:
+                self._conn.executemany("DELETE FROM distinct_values WHERE key = ?", [(key,) for key in keys])
+        except sqlite3.Error as e:
+            logger.warning(f"고유값 캐시 삭제 실패: {e}")